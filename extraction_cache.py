@@ -0,0 +1,122 @@
+"""Content-addressable on-disk cache for LlamaExtract results.
+
+Entries are keyed by the SHA-256 of the uploaded document plus a version
+string derived from the extraction agent's id, schema and config, so
+resubmitting the same file skips the LlamaExtract round-trip while switching
+or editing the agent invalidates previous results.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+# Bump when the extraction agent's prompt or schema changes
+PROMPT_VERSION = "v1"
+
+CACHE_DIR = Path(os.getenv("EXTRACTION_CACHE_DIR", "./cache"))
+CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+def new_hasher(length: int):
+    """Return a SHA-256 hasher seeded with the document's 8-byte length prefix.
+
+    Feed it the document bytes to get the same key as content_hash, e.g. while
+    the upload is being streamed.
+    """
+    return hashlib.sha256(length.to_bytes(8, "big"))
+
+
+def content_hash(source: Union[str, io.BytesIO]) -> str:
+    """Return the hex SHA-256 of a file path or buffer, prefixed with its 8-byte length."""
+    if isinstance(source, io.BytesIO):
+        with source.getbuffer() as view:
+            hasher = new_hasher(view.nbytes)
+            hasher.update(view)
+        return hasher.hexdigest()
+
+    length = os.path.getsize(source)
+    with open(source, "rb") as f:
+        # file_digest reads in chunks into a reused buffer and hashes with OpenSSL
+        return hashlib.file_digest(f, lambda: new_hasher(length)).hexdigest()
+
+
+def config_version(agent_id: str, data_schema: dict, config: dict) -> str:
+    """Return a version string covering PROMPT_VERSION and the agent's id, schema and config."""
+    config_json = json.dumps(
+        {"agent_id": agent_id, "data_schema": data_schema, "config": config},
+        sort_keys=True,
+        default=str
+    )
+    config_hash = hashlib.sha256(config_json.encode()).hexdigest()[:16]
+    return f"{PROMPT_VERSION}-{config_hash}"
+
+
+def _entry_path(content_hash: str) -> Path:
+    return CACHE_DIR / f"{content_hash}.json"
+
+
+def get(content_hash: str, version: str) -> Optional[dict]:
+    """Return the cached extraction data, or None on a miss or expired entry."""
+    path = _entry_path(content_hash)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable cache entry {path}: {e}")
+        return None
+
+    if entry.get("version") != version or entry.get("expiresAt", 0) < time.time():
+        # Stale entries are never served again, so drop them instead of letting them pile up
+        _remove(path)
+        return None
+    return entry["data"]
+
+
+def set(content_hash: str, version: str, data: dict) -> None:
+    """Store extraction data for a document, replacing any previous entry."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = _entry_path(content_hash)
+    entry = {
+        "version": version,
+        "expiresAt": time.time() + CACHE_TTL_SECONDS,
+        "data": data,
+    }
+    # Write to a sibling file and rename so readers never see a partial entry
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Failed to write cache entry {path}: {e}")
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def sweep_expired() -> None:
+    """Remove entries past their TTL, including ones that are never looked up again."""
+    if not CACHE_DIR.is_dir():
+        return
+    # Entries are written once with expiresAt = write time + TTL, so the mtime suffices
+    cutoff = time.time() - CACHE_TTL_SECONDS
+    for path in CACHE_DIR.glob("*.json"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                _remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _remove(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Failed to remove cache entry {path}: {e}")
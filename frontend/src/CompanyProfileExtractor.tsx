@@ -168,6 +168,11 @@ const CompanyProfileExtractor: React.FC = () => {
     const handleWebSocketMessage = (message: WebSocketMessage) => {
         const { job_id, status, message: statusMessage, data } = message;
 
+        // Connection notices carry no job_id and must not touch files that have no job yet
+        if (!job_id) {
+            return;
+        }
+
         console.log('Received WebSocket message:', { job_id, status });
 
         // Update file status
@@ -225,7 +230,8 @@ const CompanyProfileExtractor: React.FC = () => {
             setFiles(prev => prev.map(f =>
                 f.file === file ? {
                     ...f,
-                    status: 'queued',
+                    // Cached documents come back already completed
+                    status: data.status as FileItem['status'],
                     jobId: data.job_id,
                     clientId: data.client_id,
                     progress: data.message
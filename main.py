@@ -1,20 +1,53 @@
-import json
+import io
 import os
 import asyncio
 import uuid
-import shutil
-from typing import Dict, Optional
+import time
+from collections import OrderedDict
+from weakref import WeakValueDictionary
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple, Union
 from pathlib import Path
-from fastapi import FastAPI, File, UploadFile, WebSocket, WebSocketDisconnect, BackgroundTasks, HTTPException
+from fastapi import FastAPI, File, UploadFile, WebSocket, WebSocketDisconnect, BackgroundTasks, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from llama_cloud_services import LlamaParse, LlamaExtract
 from llama_cloud import ExtractConfig, ExtractMode, ExtractTarget, ChunkMode
 from dotenv import load_dotenv
+from arq import create_pool
+from arq.connections import RedisSettings
+import orjson
+import msgpack
+import aiofiles
 import tempfile
+import extraction_cache
 
 load_dotenv()
 
-app = FastAPI()
+# When set, extractions are queued to arq workers (see worker.py) instead of running in-process
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Redis key prefixes shared with worker.py
+STATUS_CHANNEL_PREFIX = "status:"
+JOB_STATUS_KEY_PREFIX = "job:"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the agent at startup without blocking the loop; failures are retried lazily on first use
+    await init_agent()
+    sweeper = asyncio.create_task(sweep_temp_files())
+    app.state.redis = None
+    relay = None
+    if REDIS_URL:
+        app.state.redis = await create_pool(RedisSettings.from_dsn(REDIS_URL))
+        relay = asyncio.create_task(relay_worker_status_updates(app.state.redis))
+    yield
+    sweeper.cancel()
+    if relay:
+        relay.cancel()
+        await app.state.redis.close()
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -47,49 +80,181 @@ config = ExtractConfig(
     confidence_scores=True
 )
 
+# Maximum concurrent agent.extract calls, matching the parser's num_workers
+EXTRACT_CONCURRENCY = 4
+
+# Bounded pool for the blocking agent.extract calls
+extract_executor = ThreadPoolExecutor(max_workers=EXTRACT_CONCURRENCY, thread_name_prefix="extract")
+
+# Caps in-flight LLM requests so bursts of uploads queue here instead of hitting provider rate limits
+EXTRACT_SEMAPHORE = asyncio.Semaphore(EXTRACT_CONCURRENCY)
+
+# Number of extractions currently waiting for the semaphore
+waiting_extractions = 0
+
+# Size of the chunks read from an upload while spooling it to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Spooled uploads. Queued arq jobs refer to files here by path, so the directory must
+# outlive API restarts and be shared with the workers; only orphaned files are swept.
+# With arq, EXTRACTION_CACHE_DIR must be shared too: workers write results there and
+# the API reads it to answer repeat uploads.
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", Path(tempfile.gettempdir()) / "llamaextract_uploads"))
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+# Spooled uploads owned by jobs in this process. The sweeper skips them and refreshes
+# their mtime so sweepers in other processes sharing UPLOAD_DIR leave them alone too.
+active_uploads: Set[str] = set()
+
+TMP_SWEEP_INTERVAL_SECONDS = 600
+TMP_MAX_AGE_SECONDS = 3600
+
+# arq job limits, shared with worker.py. A queued job that has not started within
+# EXTRACT_JOB_EXPIRY_SECONDS is dropped, and each run may take up to the timeout.
+EXTRACT_JOB_EXPIRY_SECONDS = 24 * 60 * 60
+EXTRACT_JOB_TIMEOUT_SECONDS = 60 * 60
+EXTRACT_JOB_MAX_TRIES = 3
+
+# Leaves headroom below the arq job timeout, so a hung extraction is reported as an
+# error instead of arq cancelling the job silently
+EXTRACT_CALL_TIMEOUT_SECONDS = EXTRACT_JOB_TIMEOUT_SECONDS - 5 * 60
+
+# Past this age no queued or retried arq job can still need an upload
+QUEUED_UPLOAD_MAX_AGE_SECONDS = EXTRACT_JOB_EXPIRY_SECONDS + EXTRACT_JOB_TIMEOUT_SECONDS * EXTRACT_JOB_MAX_TRIES
+
+# Uploads smaller than this are handed to the agent from memory instead of a temp file
+# when extraction runs in-process
+IN_MEMORY_UPLOAD_LIMIT = 10 * 1024 * 1024
+
 # Example: use a pre-created agent (from your dashboard)
-try:
-    agent = extractor.get_agent(
-        id="a025fa19-34ad-4225-b761-40f02d962662"
-    )
-except Exception as e:
-    agent = None
-    print(f"Warning: Failed to load LlamaExtract agent. Extraction will not work. Error: {e}")
+AGENT_ID = "a025fa19-34ad-4225-b761-40f02d962662"
+AGENT_LOAD_ATTEMPTS = 3
+
+# Serializes lazy agent reloads so concurrent jobs do not all retry at once
+agent_lock = asyncio.Lock()
+
+async def load_agent(attempts: int = AGENT_LOAD_ATTEMPTS):
+    """Fetch the extraction agent, retrying with exponential backoff. Returns None on failure."""
+    delay = 1
+    for attempt in range(1, attempts + 1):
+        try:
+            return await asyncio.to_thread(extractor.get_agent, id=AGENT_ID)
+        except Exception as e:
+            print(f"Warning: Failed to load LlamaExtract agent (attempt {attempt}/{attempts}). Error: {e}")
+            if attempt < attempts:
+                await asyncio.sleep(delay)
+                delay *= 2
+    return None
+
+def agent_cache_version(agent) -> str:
+    """Return the cache version for results produced by this agent.
+
+    The agent runs with its own server-side schema and config, so those, not the
+    local ExtractConfig, decide when cached results go stale.
+    """
+    config = agent.config
+    if hasattr(config, "dict"):
+        config = config.dict()
+    return extraction_cache.config_version(AGENT_ID, agent.data_schema, config)
+
+async def init_agent(attempts: int = AGENT_LOAD_ATTEMPTS):
+    """Load the agent onto app.state together with the cache version derived from it."""
+    agent = await load_agent(attempts)
+    app.state.agent = agent
+    app.state.cache_version = agent_cache_version(agent) if agent else None
+
+async def get_agent():
+    """Return the shared agent, trying once more to load it if startup failed."""
+    if app.state.agent is None:
+        async with agent_lock:
+            if app.state.agent is None:
+                await init_agent(attempts=1)
+    return app.state.agent
+
+async def get_cached_extraction(file_hash: str) -> Optional[dict]:
+    """Look up a cached result off the event loop; always a miss until the agent has loaded."""
+    if app.state.cache_version is None:
+        return None
+    return await asyncio.to_thread(extraction_cache.get, file_hash, app.state.cache_version)
+
+# Upper bound on remembered job statuses; the least recently updated are evicted first
+MAX_JOB_STATUSES = 10_000
+
+# Pre-built layout for status messages without data. job_id is a UUID and status
+# one of a few fixed literals, so only the message needs JSON escaping.
+STATUS_MESSAGE_TEMPLATE = b'{"job_id":"%s","status":"%s","message":%s,"timestamp":%f}'
+
+# Encodings a client can request for status messages via the ?format= query parameter
+MESSAGE_FORMATS = ("json", "msgpack")
 
 # Store active WebSocket connections and job statuses
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-        self.job_statuses: Dict[str, Dict] = {}
+        # Weak references, so a socket whose handler exited without calling disconnect is dropped by GC
+        self.active_connections: "WeakValueDictionary[str, WebSocket]" = WeakValueDictionary()
+        self.job_statuses: "OrderedDict[str, Dict]" = OrderedDict()
+        # Extractions currently running, keyed by document content hash
+        self.inflight: Dict[str, asyncio.Future] = {}
 
-    async def connect(self, websocket: WebSocket, client_id: str):
+    async def connect(self, websocket: WebSocket, client_id: str, message_format: str = "json"):
         await websocket.accept()
         self.active_connections[client_id] = websocket
-        # Send an initial message to confirm connection
-        await websocket.send_text(json.dumps({"message": "Connected to WebSocket!", "client_id": client_id}))
+        # Kept on the socket itself so it goes away with the connection
+        websocket.state.message_format = message_format
+        # Send an initial message to confirm connection. It is always JSON text and
+        # advertises the available formats so clients can opt in to msgpack.
+        await websocket.send_text(orjson.dumps({
+            "message": "Connected to WebSocket!",
+            "client_id": client_id,
+            "format": message_format,
+            "formats": MESSAGE_FORMATS
+        }).decode())
         print(f"Client {client_id} connected.")
 
     def disconnect(self, client_id: str):
-        if client_id in self.active_connections:
-            del self.active_connections[client_id]
+        if self.active_connections.pop(client_id, None) is not None:
             print(f"Client {client_id} disconnected.")
 
+    def _record_status(self, job_id: str, update: Dict):
+        self.job_statuses[job_id] = update
+        self.job_statuses.move_to_end(job_id)
+        while len(self.job_statuses) > MAX_JOB_STATUSES:
+            self.job_statuses.popitem(last=False)
+
     async def send_status_update(self, client_id: str, job_id: str, status: str, message: str = "", data: dict = None):
+        if client_id in self.active_connections:
+            update = {
+                "job_id": job_id,
+                "status": status,
+                "message": message,
+                # Wall-clock time, so timestamps from arq workers are comparable
+                "timestamp": time.time()
+            }
+            if data:
+                update["data"] = data
+            await self.send_update(client_id, update)
+
+    async def send_update(self, client_id: str, update: Dict):
+        """Send an already built status update to a client and record it."""
         if client_id in self.active_connections:
             try:
-                update = {
-                    "job_id": job_id,
-                    "status": status,
-                    "message": message,
-                    "timestamp": asyncio.get_event_loop().time()
-                }
-                if data:
-                    update["data"] = data
-                
-                await self.active_connections[client_id].send_text(json.dumps(update))
+                websocket = self.active_connections.get(client_id)
+                if websocket is None:
+                    return
+                if websocket.state.message_format == "msgpack":
+                    await websocket.send_bytes(msgpack.packb(update, use_bin_type=True))
+                else:
+                    if "data" in update:
+                        payload = orjson.dumps(update)
+                    else:
+                        payload = STATUS_MESSAGE_TEMPLATE % (
+                            update["job_id"].encode(), update["status"].encode(),
+                            orjson.dumps(update["message"]), update["timestamp"]
+                        )
+                    await websocket.send_text(payload.decode())
                 
                 # Update job status
-                self.job_statuses[job_id] = update
+                self._record_status(update["job_id"], update)
             except WebSocketDisconnect:
                 self.disconnect(client_id)
             except Exception as e:
@@ -98,14 +263,76 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
-async def process_file_extraction(client_id: str, job_id: str, file_content: bytes, filename: str):
-    """Background task to process file extraction with status updates."""
-    temp_file_path = None
+async def run_extraction(
+    file_hash: str,
+    source: Union[str, io.BytesIO],
+    on_queued: Optional[Callable[[int], Awaitable[None]]] = None
+) -> dict:
+    """Run the agent on a file, sharing the result with concurrent uploads of the same document.
+
+    on_queued is awaited with the number of jobs already waiting when all extraction slots are busy.
+    """
+    global waiting_extractions
+    pending = manager.inflight.get(file_hash)
+    if pending is not None:
+        # Shield so a cancelled waiter does not cancel the extraction it shares
+        return await asyncio.shield(pending)
+
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    manager.inflight[file_hash] = future
     try:
+        agent = await get_agent()
         if not agent:
             raise Exception("LlamaExtract agent not initialized.")
 
-        await manager.send_status_update(
+        if EXTRACT_SEMAPHORE.locked() and on_queued:
+            await on_queued(waiting_extractions)
+        waiting_extractions += 1
+        try:
+            await EXTRACT_SEMAPHORE.acquire()
+        finally:
+            waiting_extractions -= 1
+
+        try:
+            # Pass the temporary file path or in-memory buffer to the agent
+            llama_parser_result = await asyncio.wait_for(
+                loop.run_in_executor(extract_executor, agent.extract, source),
+                EXTRACT_CALL_TIMEOUT_SECONDS
+            )
+        except TimeoutError:
+            raise Exception(f"Extraction timed out after {EXTRACT_CALL_TIMEOUT_SECONDS} seconds.")
+        finally:
+            EXTRACT_SEMAPHORE.release()
+        extracted = llama_parser_result.data
+        future.set_result(extracted)
+        await asyncio.to_thread(extraction_cache.set, file_hash, app.state.cache_version, extracted)
+        return extracted
+    except Exception as e:
+        future.set_exception(e)
+        # Mark the exception as retrieved in case no other upload is waiting on it
+        future.exception()
+        raise
+    finally:
+        if not future.done():
+            future.cancel()
+        del manager.inflight[file_hash]
+
+async def process_file_extraction(
+    client_id: str,
+    job_id: str,
+    source: Union[str, io.BytesIO],
+    filename: str,
+    file_hash: str,
+    notifier=manager
+):
+    """Background task to process file extraction with status updates.
+
+    notifier receives the status updates; arq workers pass one that publishes them through Redis.
+    """
+    finished = True
+    try:
+        await notifier.send_status_update(
             client_id, job_id, "processing", 
             f"Starting extraction for {filename}..."
         )
@@ -114,45 +341,141 @@ async def process_file_extraction(client_id: str, job_id: str, file_content: byt
         # print the jobid
         print(f"Job ID: {job_id}")
 
-        # Create a temporary file with proper cleanup
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix) as temp_file:
-            temp_file.write(file_content)
-            temp_file_path = temp_file.name
+        # An identical document may have finished extracting since the upload was checked
+        extracted = await get_cached_extraction(file_hash)
 
-        await manager.send_status_update(
-            client_id, job_id, "processing", 
-            f"File saved temporarily, running extraction..."
-        )
+        if extracted is None:
+            if file_hash in manager.inflight:
+                await notifier.send_status_update(
+                    client_id, job_id, "processing",
+                    "An identical document is already being extracted, waiting for its result..."
+                )
+
+            async def report_queued(jobs_waiting: int):
+                # Every slot is taken, so the running jobs are ahead of this one too
+                jobs_ahead = jobs_waiting + EXTRACT_CONCURRENCY
+                await notifier.send_status_update(
+                    client_id, job_id, "processing",
+                    f"All extraction slots are busy, {jobs_ahead} job(s) ahead in the queue..."
+                )
 
-        # Pass the temporary file path to the agent
-        llama_parser_result = agent.extract(temp_file_path)
+            extracted = await run_extraction(file_hash, source, on_queued=report_queued)
+        else:
+            print(f"Cache hit for {filename} ({file_hash})")
 
-        await manager.send_status_update(
+        await notifier.send_status_update(
             client_id, job_id, "completed",
             "Extraction completed successfully!",
             data={
                 "file": filename,
-                "extracted": llama_parser_result.data
+                "extracted": extracted
             }
         )
 
+    except asyncio.CancelledError:
+        # arq cancels running jobs on worker shutdown and re-queues them, so keep the upload
+        # for the retry; files of jobs that never finish are left to sweep_temp_files
+        finished = False
+        raise
     except Exception as e:
-        await manager.send_status_update(
+        await notifier.send_status_update(
             client_id, job_id, "error",
             f"Extraction failed: {str(e)}"
         )
     finally:
-        # Clean up the temporary file
-        if temp_file_path and os.path.exists(temp_file_path):
+        if isinstance(source, str):
+            active_uploads.discard(source)
+        # Clean up the temporary file once the job has succeeded or failed for good
+        if finished and isinstance(source, str) and os.path.exists(source):
             try:
-                os.unlink(temp_file_path)
+                os.unlink(source)
             except Exception as cleanup_error:
-                print(f"Failed to cleanup temp file {temp_file_path}: {cleanup_error}")
+                print(f"Failed to cleanup temp file {source}: {cleanup_error}")
+
+async def save_upload_to_temp_file(file: UploadFile) -> Tuple[str, str]:
+    """Stream an upload to a new temporary file without blocking the event loop.
+
+    Returns the temporary file path and the upload's content hash.
+    """
+    fd, temp_file_path = tempfile.mkstemp(suffix=Path(file.filename).suffix, dir=UPLOAD_DIR)
+    os.close(fd)
+    # The length prefix of the hash needs the size up front, which the multipart parser records
+    hasher = extraction_cache.new_hasher(file.size) if file.size is not None else None
+    try:
+        # Memory stays bounded by the chunk size, and 1 MiB chunks keep write syscalls few
+        async with aiofiles.open(temp_file_path, "wb") as temp_file:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                # A single pass over the upload feeds both the disk write and the hash
+                await temp_file.write(chunk)
+                if hasher:
+                    hasher.update(chunk)
+
+        if hasher:
+            file_hash = hasher.hexdigest()
+        else:
+            file_hash = await asyncio.to_thread(extraction_cache.content_hash, temp_file_path)
+    except Exception:
+        os.unlink(temp_file_path)
+        raise
+    return temp_file_path, file_hash
+
+def remove_stale_uploads(owned: Set[str], max_age: float):
+    """Mark this process's uploads as in use, then remove uploads older than max_age.
+
+    UPLOAD_DIR is shared by every API process, and other processes only see file
+    mtimes, so owned files are touched on every sweep to keep them fresh for all.
+    """
+    for path in owned:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    cutoff = time.time() - max_age
+    for path in UPLOAD_DIR.iterdir():
+        if str(path) in owned:
+            continue
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                print(f"Removed stale temp file {path}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Failed to remove stale temp file {path}: {e}")
+
+async def sweep_temp_files():
+    """Periodically remove spooled uploads that outlived their extraction job."""
+    # With arq, files may belong to jobs still waiting in Redis
+    max_age = QUEUED_UPLOAD_MAX_AGE_SECONDS if REDIS_URL else TMP_MAX_AGE_SECONDS
+    while True:
+        await asyncio.sleep(TMP_SWEEP_INTERVAL_SECONDS)
+        # Jobs can wait behind EXTRACT_SEMAPHORE for longer than max_age
+        await asyncio.to_thread(remove_stale_uploads, set(active_uploads), max_age)
+        await asyncio.to_thread(extraction_cache.sweep_expired)
+
+async def relay_worker_status_updates(redis):
+    """Forward status updates published by arq workers to this process's WebSocket clients."""
+    pubsub = redis.pubsub()
+    await pubsub.psubscribe(f"{STATUS_CHANNEL_PREFIX}*")
+    try:
+        async for message in pubsub.listen():
+            if message["type"] != "pmessage":
+                continue
+            client_id = message["channel"].decode()[len(STATUS_CHANNEL_PREFIX):]
+            try:
+                await manager.send_update(client_id, orjson.loads(message["data"]))
+            except Exception as e:
+                print(f"Failed to relay status update to client {client_id}: {e}")
+    finally:
+        await pubsub.close()
 
 @app.websocket("/ws/{client_id}")
-async def websocket_endpoint(websocket: WebSocket, client_id: str):
+async def websocket_endpoint(websocket: WebSocket, client_id: str, message_format: str = Query("json", alias="format")):
     print(f"Client {client_id} connected to WebSocket.")
-    await manager.connect(websocket, client_id)
+    if message_format not in MESSAGE_FORMATS:
+        message_format = "json"
+    await manager.connect(websocket, client_id, message_format)
     try:
         # Keep the connection open indefinitely
         while True:
@@ -175,22 +498,72 @@ async def extract_document(client_id: str, background_tasks: BackgroundTasks, fi
     # Generate a unique job ID
     job_id = str(uuid.uuid4())
     
+    temp_file_path = None
     try:
-        # Read the file content immediately while the UploadFile is still open
-        file_content = await file.read()
         filename = file.filename
-        
+
+        # arq jobs get a path: a buffer would be pickled into Redis with the job and its result
+        if not REDIS_URL and file.size is not None and file.size < IN_MEMORY_UPLOAD_LIMIT:
+            # Small files skip the disk round-trip; the name lets the agent detect the file type
+            source = io.BytesIO(await file.read())
+            source.name = filename
+            file_hash = await asyncio.to_thread(extraction_cache.content_hash, source)
+        else:
+            temp_file_path, file_hash = await save_upload_to_temp_file(file)
+            active_uploads.add(temp_file_path)
+            source = temp_file_path
+
         # Close the file after reading
         await file.close()
+
+        # Answer straight away when this document has already been extracted
+        extracted = await get_cached_extraction(file_hash)
+        if extracted is not None:
+            print(f"Cache hit for {filename} ({file_hash})")
+            if temp_file_path:
+                active_uploads.discard(temp_file_path)
+                os.unlink(temp_file_path)
+            data = {
+                "file": filename,
+                "extracted": extracted
+            }
+            await manager.send_status_update(
+                client_id, job_id, "completed",
+                "Extraction completed successfully!",
+                data=data
+            )
+            return {
+                "job_id": job_id,
+                "client_id": client_id,
+                "status": "completed",
+                "message": "Extraction completed successfully!",
+                "data": data
+            }
         
-        # Pass the file content (bytes) and filename to the background task
-        background_tasks.add_task(
-            process_file_extraction, 
-            client_id, 
-            job_id, 
-            file_content,
-            filename
-        )
+        # Pass the file source and filename to the background task, which
+        # takes ownership of any temporary file and removes it when done
+        if app.state.redis is not None:
+            await app.state.redis.enqueue_job(
+                "process_file_extraction_task",
+                client_id,
+                job_id,
+                source,
+                filename,
+                file_hash,
+                _expires=EXTRACT_JOB_EXPIRY_SECONDS
+            )
+            # The worker owns the upload now; the sweeper's long arq max age protects it
+            if temp_file_path:
+                active_uploads.discard(temp_file_path)
+        else:
+            background_tasks.add_task(
+                process_file_extraction, 
+                client_id, 
+                job_id, 
+                source,
+                filename,
+                file_hash
+            )
         
         return {
             "job_id": job_id,
@@ -200,12 +573,21 @@ async def extract_document(client_id: str, background_tasks: BackgroundTasks, fi
         }
         
     except Exception as e:
+        if temp_file_path:
+            active_uploads.discard(temp_file_path)
+            if os.path.exists(temp_file_path):
+                os.unlink(temp_file_path)
         raise HTTPException(status_code=500, detail=f"Failed to process file: {str(e)}")
 
 @app.get("/status/{job_id}")
 async def get_job_status(job_id: str):
     """Get the current status of a job."""
     print(manager.job_statuses)
+    if app.state.redis is not None:
+        # Jobs run by arq workers record their latest status in Redis
+        status = await app.state.redis.get(f"{JOB_STATUS_KEY_PREFIX}{job_id}")
+        if status is not None:
+            return orjson.loads(status)
     if job_id in manager.job_statuses:
         return manager.job_statuses[job_id]
     else:
@@ -217,4 +599,24 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # WebSocket connections and job statuses live in process memory, so an upload
+    # must reach the same worker as its client's WebSocket. Only raise the worker
+    # count behind a load balancer with sticky sessions.
+    workers = int(os.getenv("UVICORN_WORKERS", "1"))
+    uvicorn.run(
+        # Multiple workers need an import string; a single worker reuses this module
+        # rather than importing it again and repeating its side effects
+        "main:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        # "auto" picks uvloop and httptools when installed (uvicorn[standard]) and
+        # falls back to asyncio and h11 where they are not, e.g. uvloop on Windows
+        loop="auto",
+        http="auto",
+        # Protocol-level keepalive pings every 30s (uvicorn defaults to 20s). A peer that
+        # misses one ends its receive loop and is disconnected. Pass the same options
+        # when launching uvicorn from the command line.
+        ws_ping_interval=30,
+        ws_ping_timeout=30,
+    )
\ No newline at end of file
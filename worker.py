@@ -0,0 +1,66 @@
+"""arq worker that runs document extractions outside the web process.
+
+Run it next to the API with the same REDIS_URL:
+
+    arq worker.WorkerSettings
+
+The API and the workers must share two directories:
+
+- UPLOAD_DIR, where the API spools uploads and workers read them by path.
+- EXTRACTION_CACHE_DIR, where workers store results and the API looks them up
+  to answer repeat uploads. Otherwise the API never sees a cache hit.
+"""
+import os
+import time
+from typing import Dict
+
+import orjson
+from arq.connections import RedisSettings
+
+import main
+
+# How long a finished job's status stays queryable through /status/{job_id}
+JOB_STATUS_TTL_SECONDS = 24 * 60 * 60
+
+
+class RedisStatusPublisher:
+    """Stores job statuses in Redis and publishes them for the API to relay to WebSockets."""
+
+    def __init__(self, redis):
+        self.redis = redis
+
+    async def send_status_update(self, client_id: str, job_id: str, status: str, message: str = "", data: dict = None):
+        update: Dict = {
+            "job_id": job_id,
+            "status": status,
+            "message": message,
+            "timestamp": time.time()
+        }
+        if data:
+            update["data"] = data
+
+        payload = orjson.dumps(update)
+        await self.redis.set(f"{main.JOB_STATUS_KEY_PREFIX}{job_id}", payload, ex=JOB_STATUS_TTL_SECONDS)
+        await self.redis.publish(f"{main.STATUS_CHANNEL_PREFIX}{client_id}", payload)
+
+
+async def process_file_extraction_task(ctx, client_id: str, job_id: str, source, filename: str, file_hash: str):
+    await main.process_file_extraction(
+        client_id, job_id, source, filename, file_hash,
+        notifier=ctx["publisher"]
+    )
+
+
+async def startup(ctx):
+    await main.init_agent()
+    ctx["publisher"] = RedisStatusPublisher(ctx["redis"])
+
+
+class WorkerSettings:
+    functions = [process_file_extraction_task]
+    on_startup = startup
+    redis_settings = RedisSettings.from_dsn(os.getenv("REDIS_URL", "redis://localhost:6379"))
+    # Leave surplus jobs queued in Redis rather than waiting in memory for an extraction slot
+    max_jobs = main.EXTRACT_CONCURRENCY
+    job_timeout = main.EXTRACT_JOB_TIMEOUT_SECONDS
+    max_tries = main.EXTRACT_JOB_MAX_TRIES